@@ -4,6 +4,7 @@ Google Slides API Permission Checker
 Kiểm tra quyền truy cập và test Google Slides API
 """
 
+import argparse
 import os
 import sys
 import re
@@ -18,17 +19,88 @@ try:
     from google_auth_oauthlib.flow import InstalledAppFlow
     from googleapiclient.discovery import build
     from googleapiclient.errors import HttpError
+    from googleapiclient.model import JsonModel
     print("✅ Google API libraries imported successfully")
 except ImportError as e:
     print("❌ Missing Google API libraries!")
     print("Run: pip install --upgrade google-api-python-client google-auth-httplib2 google-auth-oauthlib")
     sys.exit(1)
 
+# Optional: orjson serializes output much faster than the stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonModel(JsonModel):
+    """JsonModel that parses API responses with orjson"""
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Same as JsonModel: hand back non-JSON bodies unchanged
+            return content
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
 # Scopes - chỉ cần read-only
 SCOPES = ['https://www.googleapis.com/auth/presentations.readonly']
 
+# Field mask - chỉ lấy những field mà tool thực sự đọc
+PRESENTATION_FIELDS = (
+    'title,'
+    'slides('
+    'objectId,'
+    'pageElements(objectId,shape/text/textElements/textRun/content,image/contentUrl),'
+    'notesPage/pageElements(shape/text/textElements/textRun/content)'
+    ')'
+)
+
+# Field mask nhẹ cho việc chỉ kiểm tra quyền truy cập
+PROBE_FIELDS = 'title,slides/objectId'
+
+# Số request tối đa trong một batch HTTP request
+BATCH_SIZE = 100
+
+# Regex để lấy presentation ID từ URL hoặc ID trần (compile sẵn một lần)
+_ID_RE = re.compile(
+    r'(?:/presentation/d/|[?&]id=)(?P<id>[a-zA-Z0-9_-]+)'
+    r'|\A(?P<bare>[a-zA-Z0-9_-]+)\Z'
+)
+
+
+def _join_text_runs(text_elements):
+    """Concatenate the textRun contents of a shape's textElements"""
+    return ''.join([
+        run['textRun'].get('content', '')
+        for run in text_elements
+        if 'textRun' in run
+    ])
+
+class SlideData:
+    """Extracted content of one slide"""
+    
+    __slots__ = ('slide_number', 'slide_id', 'text_content',
+                 'speaker_notes', 'images', 'shapes')
+    
+    def __init__(self, slide_number, slide_id):
+        self.slide_number = slide_number
+        self.slide_id = slide_id
+        self.text_content = []
+        self.speaker_notes = ''
+        self.images = []
+        self.shapes = []
+    
+    def to_dict(self):
+        """Convert to a plain dict for JSON output"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
 class GoogleSlidesChecker:
-    def __init__(self):
+    def __init__(self, pretty_json=False):
+        self.pretty_json = pretty_json
         self.creds = None
         self.service = None
         self.credentials_file = "credentials.json"
@@ -55,29 +127,38 @@ class GoogleSlidesChecker:
         if os.path.exists(self.token_file):
             self.creds = Credentials.from_authorized_user_file(self.token_file, SCOPES)
         
+        # Token still valid - nothing to refresh or save
+        if self.creds and self.creds.valid:
+            return True
+        
         # If no valid credentials, run OAuth flow
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
-                print("🔄 Refreshing expired token...")
-                self.creds.refresh(Request())
-            else:
-                print("🌐 Starting OAuth flow...")
-                print("Your browser will open. Please login and authorize the app.")
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    self.credentials_file, SCOPES)
-                self.creds = flow.run_local_server(port=0)
-            
-            # Save credentials for next time
-            with open(self.token_file, 'w') as token:
-                token.write(self.creds.to_json())
-            print("✅ Credentials saved!")
+        if self.creds and self.creds.expired and self.creds.refresh_token:
+            print("🔄 Refreshing expired token...")
+            self.creds.refresh(Request())
+        else:
+            print("🌐 Starting OAuth flow...")
+            print("Your browser will open. Please login and authorize the app.")
+            flow = InstalledAppFlow.from_client_secrets_file(
+                self.credentials_file, SCOPES)
+            self.creds = flow.run_local_server(port=0)
+        
+        # Save credentials for next time
+        with open(self.token_file, 'w') as token:
+            token.write(self.creds.to_json())
+        print("✅ Credentials saved!")
         
         return True
     
     def build_service(self):
         """Build Google Slides service"""
         try:
-            self.service = build('slides', 'v1', credentials=self.creds)
+            # Use the discovery document bundled with the client library
+            # instead of fetching it from the network on every start
+            self.service = build(
+                'slides', 'v1', credentials=self.creds,
+                static_discovery=True, cache_discovery=False,
+                model=OrjsonModel() if orjson is not None else None
+            )
             print("✅ Google Slides service initialized")
             return True
         except Exception as e:
@@ -86,31 +167,28 @@ class GoogleSlidesChecker:
     
     def extract_presentation_id(self, url):
         """Extract presentation ID from Google Slides URL"""
-        patterns = [
-            r'/presentation/d/([a-zA-Z0-9-_]+)',
-            r'id=([a-zA-Z0-9-_]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        
-        # If it's already just an ID
-        if re.match(r'^[a-zA-Z0-9-_]+$', url):
-            return url
+        match = _ID_RE.search(url)
+        if match:
+            # Either a URL containing the ID, or already just an ID
+            return match.group('id') or match.group('bare')
         
         return None
     
+    def fetch_presentation(self, presentation_id):
+        """Fetch a presentation with only the fields the tool reads"""
+        return self.service.presentations().get(
+            presentationId=presentation_id,
+            fields=PRESENTATION_FIELDS
+        ).execute()
+    
     def test_presentation_access(self, presentation_id):
         """Test if we can access the presentation"""
         print(f"\n🔍 Testing access to presentation: {presentation_id}")
         
         try:
-            # Try to get basic presentation info
-            presentation = self.service.presentations().get(
-                presentationId=presentation_id
-            ).execute()
+            # Try to get basic presentation info. The response carries everything
+            # the sample preview and full extraction read, so it is the only fetch.
+            presentation = self.fetch_presentation(presentation_id)
             
             title = presentation.get('title', 'Untitled')
             slide_count = len(presentation.get('slides', []))
@@ -144,6 +222,56 @@ class GoogleSlidesChecker:
             print(f"❌ Unexpected error: {e}")
             return False, None
     
+    def probe_many(self, presentation_ids):
+        """Test access to several presentations using batched API requests"""
+        print(f"\n🔍 Testing access to {len(presentation_ids)} presentations...")
+        
+        results = {}
+        
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+        
+        # One HTTP round trip per batch instead of one per presentation
+        for start in range(0, len(presentation_ids), BATCH_SIZE):
+            chunk = presentation_ids[start:start + BATCH_SIZE]
+            batch = self.service.new_batch_http_request(callback=callback)
+            for presentation_id in chunk:
+                batch.add(
+                    self.service.presentations().get(
+                        presentationId=presentation_id,
+                        fields=PROBE_FIELDS
+                    ),
+                    request_id=presentation_id
+                )
+            try:
+                batch.execute()
+            except HttpError as e:
+                print(f"❌ Batch request failed: HTTP Error {e.resp.status}")
+                failure = e
+            except Exception as e:
+                print(f"❌ Batch request failed: {e}")
+                failure = e
+            else:
+                continue
+            
+            # Mark the IDs this batch did not answer, then go on with the next one
+            for presentation_id in chunk:
+                results.setdefault(presentation_id, (None, failure))
+        
+        # Collect all result lines and write them to stdout in one go
+        lines = []
+        for presentation_id in presentation_ids:
+            response, exception = results.get(presentation_id, (None, "No response received"))
+            if exception is None:
+                title = response.get('title', 'Untitled')
+                slide_count = len(response.get('slides', []))
+                lines.append(f"✅ {presentation_id}: {title} ({slide_count} slides)")
+            elif isinstance(exception, HttpError):
+                lines.append(f"❌ {presentation_id}: HTTP Error {exception.resp.status}")
+            else:
+                lines.append(f"❌ {presentation_id}: {exception}")
+        print('\n'.join(lines))
+    
     def extract_sample_content(self, presentation):
         """Extract and display sample content"""
         print("\n📝 Sample content extraction:")
@@ -157,38 +285,37 @@ class GoogleSlidesChecker:
         first_slide = slides[0]
         print(f"   🎯 First slide (ID: {first_slide['objectId']}):")
         
-        text_found = False
-        for element in first_slide.get('pageElements', []):
-            if 'shape' in element and 'text' in element['shape']:
-                text_elements = element['shape']['text']['textElements']
-                text = ''.join(
-                    run.get('textRun', {}).get('content', '')
-                    for run in text_elements
-                ).strip()
+        # Preview the first text block, stop scanning as soon as it is found
+        preview = None
+        for element in first_slide.get('pageElements') or ():
+            shape = element.get('shape')
+            text_body = shape.get('text') if shape else None
+            if text_body:
+                text_elements = text_body['textElements']
+                text = _join_text_runs(text_elements).strip()
                 
                 if text:
                     # Show first 100 characters
                     preview = text[:100] + "..." if len(text) > 100 else text
-                    print(f"      📄 Text: {preview}")
-                    text_found = True
                     break
         
-        if not text_found:
+        if preview is not None:
+            print(f"      📄 Text: {preview}")
+        else:
             print("      📄 No text content found in first slide")
         
+        # Single pass over all slides for image and notes counts
+        image_count = 0
+        notes_count = 0
+        for slide in slides:
+            for element in slide.get('pageElements') or ():
+                image_count += 'image' in element
+            notes_count += bool((slide.get('notesPage') or {}).get('pageElements'))
+        
         # Check for images
-        image_count = sum(
-            1 for slide in slides
-            for element in slide.get('pageElements', [])
-            if 'image' in element
-        )
         print(f"   🖼️  Total images: {image_count}")
         
         # Check for speaker notes
-        notes_count = sum(
-            1 for slide in slides
-            if slide.get('notesPage', {}).get('pageElements')
-        )
         print(f"   🗣️  Slides with notes: {notes_count}")
     
     def run_interactive_test(self):
@@ -209,7 +336,7 @@ class GoogleSlidesChecker:
         # Step 3: Interactive testing
         while True:
             print("\n" + "="*50)
-            url_or_id = input("📎 Enter Google Slides URL or Presentation ID (or 'quit' to exit): ").strip()
+            url_or_id = input("📎 Enter Google Slides URL or Presentation ID, comma-separated for several (or 'quit' to exit): ").strip()
             
             if url_or_id.lower() in ['quit', 'exit', 'q']:
                 break
@@ -217,6 +344,25 @@ class GoogleSlidesChecker:
             if not url_or_id:
                 continue
             
+            # Several URLs/IDs: only check access, all in one batch
+            if ',' in url_or_id:
+                presentation_ids = []
+                for item in url_or_id.split(','):
+                    item = item.strip()
+                    if not item:
+                        continue
+                    presentation_id = self.extract_presentation_id(item)
+                    if presentation_id:
+                        presentation_ids.append(presentation_id)
+                    else:
+                        print(f"❌ Invalid URL or ID format: {item}")
+                
+                # Drop duplicates, batch request IDs must be unique
+                presentation_ids = list(dict.fromkeys(presentation_ids))
+                if presentation_ids:
+                    self.probe_many(presentation_ids)
+                continue
+            
             # Extract presentation ID
             presentation_id = self.extract_presentation_id(url_or_id)
             if not presentation_id:
@@ -250,72 +396,99 @@ class GoogleSlidesChecker:
         }
         
         for i, slide in enumerate(presentation.get('slides', [])):
-            slide_data = {
-                'slide_number': i + 1,
-                'slide_id': slide['objectId'],
-                'text_content': [],
-                'speaker_notes': '',
-                'images': [],
-                'shapes': []
-            }
+            slide_data = SlideData(i + 1, slide['objectId'])
             
             # Extract text from shapes
             for element in slide.get('pageElements', []):
-                if 'shape' in element and 'text' in element['shape']:
-                    text_elements = element['shape']['text']['textElements']
-                    text = ''.join(
-                        run.get('textRun', {}).get('content', '')
-                        for run in text_elements
-                    ).strip()
+                shape = element.get('shape')
+                text_body = shape.get('text') if shape else None
+                if text_body:
+                    text_elements = text_body['textElements']
+                    text = _join_text_runs(text_elements).strip()
                     
                     if text:
-                        slide_data['text_content'].append({
+                        slide_data.text_content.append({
                             'object_id': element['objectId'],
                             'text': text
                         })
                 
                 # Extract images
-                if 'image' in element:
-                    slide_data['images'].append({
+                image = element.get('image')
+                if image is not None:
+                    slide_data.images.append({
                         'object_id': element['objectId'],
-                        'content_url': element['image']['contentUrl']
+                        'content_url': image['contentUrl']
                     })
             
             # Extract speaker notes
             notes_page = slide.get('notesPage', {})
             for element in notes_page.get('pageElements', []):
-                if 'shape' in element and 'text' in element['shape']:
-                    notes_elements = element['shape']['text']['textElements']
-                    notes = ''.join(
-                        run.get('textRun', {}).get('content', '')
+                shape = element.get('shape')
+                text_body = shape.get('text') if shape else None
+                if text_body:
+                    notes_elements = text_body['textElements']
+                    
+                    # Placeholder is the first text run, skip it before joining
+                    first_run = next((
+                        run['textRun'].get('content', '')
                         for run in notes_elements
-                    ).strip()
+                        if 'textRun' in run
+                    ), '')
+                    if 'Click to add speaker notes' in first_run:
+                        continue
                     
-                    if notes and 'Click to add speaker notes' not in notes:
-                        slide_data['speaker_notes'] = notes
+                    notes = _join_text_runs(notes_elements).strip()
+                    if notes:
+                        slide_data.speaker_notes = notes
             
             extracted_data['slides'].append(slide_data)
         
         # Save to file
         output_file = f"slides_content_{presentation_id}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(extracted_data, f, ensure_ascii=False, indent=2)
+        # Compact JSON by default, indented only when asked for (--pretty)
+        if orjson is not None:
+            option = orjson.OPT_APPEND_NEWLINE
+            if self.pretty_json:
+                option |= orjson.OPT_INDENT_2
+            Path(output_file).write_bytes(orjson.dumps(
+                extracted_data, option=option, default=SlideData.to_dict
+            ))
+        else:
+            # newline='\n': write bare LF like orjson, also on Windows
+            with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
+                json.dump(
+                    extracted_data, f, ensure_ascii=False,
+                    indent=2 if self.pretty_json else None,
+                    separators=None if self.pretty_json else (',', ':'),
+                    default=SlideData.to_dict
+                )
+                # Match orjson's OPT_APPEND_NEWLINE
+                f.write('\n')
         
         print(f"✅ Full content saved to: {output_file}")
         
         # Show summary
-        total_text_blocks = sum(len(slide['text_content']) for slide in extracted_data['slides'])
-        total_images = sum(len(slide['images']) for slide in extracted_data['slides'])
-        slides_with_notes = sum(1 for slide in extracted_data['slides'] if slide['speaker_notes'])
+        total_text_blocks = sum(len(slide.text_content) for slide in extracted_data['slides'])
+        total_images = sum(len(slide.images) for slide in extracted_data['slides'])
+        slides_with_notes = sum(1 for slide in extracted_data['slides'] if slide.speaker_notes)
         
-        print(f"📊 Extraction Summary:")
-        print(f"   📄 Total slides: {len(extracted_data['slides'])}")
-        print(f"   📝 Text blocks: {total_text_blocks}")
-        print(f"   🖼️  Images: {total_images}")
-        print(f"   🗣️  Slides with notes: {slides_with_notes}")
+        print('\n'.join([
+            f"📊 Extraction Summary:",
+            f"   📄 Total slides: {len(extracted_data['slides'])}",
+            f"   📝 Text blocks: {total_text_blocks}",
+            f"   🖼️  Images: {total_images}",
+            f"   🗣️  Slides with notes: {slides_with_notes}",
+        ]))
 
 def main():
-    checker = GoogleSlidesChecker()
+    parser = argparse.ArgumentParser(description="Google Slides API Permission Checker")
+    parser.add_argument(
+        '--pretty', action='store_true',
+        help="write extracted content as indented JSON (default: compact)"
+    )
+    args = parser.parse_args()
+    
+    checker = GoogleSlidesChecker(pretty_json=args.pretty)
     checker.run_interactive_test()
 
 if __name__ == "__main__":